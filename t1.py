@@ -1,21 +1,22 @@
+import re
+from io import BytesIO
 import streamlit as st
 from pytube import YouTube
 from pytube.exceptions import VideoUnavailable, RegexMatchError
 
+_ID_RE = re.compile(r'^[a-zA-Z0-9_-]{11}$')
+_URL_RE = re.compile(r'(?:youtube\.com/(?:watch\?v=|embed/)|youtu\.be/)([a-zA-Z0-9_-]{11})')
+
 def extract_video_id(url):
-    import re
-    if re.match(r'^[a-zA-Z0-9_-]{11}$', url):
+    if _ID_RE.match(url):
         return url
-    patterns = [
-        r'youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
-        r'youtu\.be/([a-zA-Z0-9_-]{11})',
-        r'youtube\.com/embed/([a-zA-Z0-9_-]{11})'
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
+    match = _URL_RE.search(url)
+    return match.group(1) if match else None
+
+# Signed stream URLs expire after a few hours
+@st.cache_resource(show_spinner=False, ttl=3600)
+def get_yt(video_id):
+    return YouTube(f"https://www.youtube.com/watch?v={video_id}")
 
 st.title("YouTube Video & Audio Downloader (pytube)")
 
@@ -26,9 +27,8 @@ if video_url:
     if not video_id:
         st.error("Invalid YouTube URL or Video ID.")
     else:
-        full_url = f"https://www.youtube.com/watch?v={video_id}"
         try:
-            yt = YouTube(full_url)
+            yt = get_yt(video_id)
         except VideoUnavailable:
             st.error("Video unavailable.")
             st.stop()
@@ -46,45 +46,49 @@ if video_url:
         download_type = st.radio("Select download type:", ("Video", "Audio"))
 
         if download_type == "Video":
-            streams = yt.streams.filter(progressive=True).order_by('resolution').desc()
-            options = [stream.resolution for stream in streams]
-            selected_res = st.selectbox("Select resolution:", options)
+            streams_by_res = {}
+            for s in yt.streams.filter(progressive=True).order_by('resolution').desc():
+                streams_by_res.setdefault(s.resolution, s)
+            selected_res = st.selectbox("Select resolution:", list(streams_by_res))
 
-            stream = streams.filter(res=selected_res).first()
+            stream = streams_by_res.get(selected_res)
 
             if st.button("Download Video"):
                 if stream:
+                    buffer = BytesIO()
                     with st.spinner("Downloading video..."):
-                        file_path = stream.download()
-                    st.success(f"Downloaded video: {file_path}")
-                    with open(file_path, "rb") as f:
-                        st.download_button(
-                            label="Click here to download video file",
-                            data=f,
-                            file_name=f"{yt.title}_{selected_res}.mp4",
-                            mime="video/mp4"
-                        )
+                        stream.stream_to_buffer(buffer)
+                    buffer.seek(0)
+                    st.success(f"Downloaded video: {stream.default_filename}")
+                    st.download_button(
+                        label="Click here to download video file",
+                        data=buffer,
+                        file_name=f"{yt.title}_{selected_res}.mp4",
+                        mime="video/mp4"
+                    )
                 else:
                     st.error("Selected resolution not available.")
 
         else:  # Audio download
-            streams = yt.streams.filter(only_audio=True).order_by('abr').desc()
-            options = [stream.abr for stream in streams]
-            selected_abr = st.selectbox("Select audio bitrate:", options)
+            streams_by_abr = {}
+            for s in yt.streams.filter(only_audio=True).order_by('abr').desc():
+                streams_by_abr.setdefault(s.abr, s)
+            selected_abr = st.selectbox("Select audio bitrate:", list(streams_by_abr))
 
-            stream = streams.filter(abr=selected_abr).first()
+            stream = streams_by_abr.get(selected_abr)
 
             if st.button("Download Audio"):
                 if stream:
+                    buffer = BytesIO()
                     with st.spinner("Downloading audio..."):
-                        file_path = stream.download(filename_prefix="audio_")
-                    st.success(f"Downloaded audio: {file_path}")
-                    with open(file_path, "rb") as f:
-                        st.download_button(
-                            label="Click here to download audio file",
-                            data=f,
-                            file_name=f"{yt.title}_{selected_abr}.mp3",
-                            mime="audio/mp3"
-                        )
+                        stream.stream_to_buffer(buffer)
+                    buffer.seek(0)
+                    st.success(f"Downloaded audio: {stream.default_filename}")
+                    st.download_button(
+                        label="Click here to download audio file",
+                        data=buffer,
+                        file_name=f"{yt.title}_{selected_abr}.mp3",
+                        mime="audio/mp3"
+                    )
                 else:
                     st.error("Selected audio bitrate not available.")
@@ -1,131 +1,281 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from io import BytesIO
 from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import (
+    BaseDocTemplate, PageTemplate, Frame, NextPageTemplate, PageBreak,
+    Paragraph, Spacer, LongTable, TableStyle, Image
+)
 from reportlab.lib.units import mm
 from reportlab.lib import colors
-from collections import Counter
-import plotly.express as px
 import os
+import hashlib
+from collections import OrderedDict
+import xlsxwriter
 
 # --- Helper Functions ---
 
-def load_excel(file):
-    xls = pd.ExcelFile(file)
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_excel(file_bytes):
+    # calamine (Rust) is much faster than openpyxl; fall back when it isn't installed
+    try:
+        xls = pd.ExcelFile(BytesIO(file_bytes), engine="calamine")
+    except (ImportError, ValueError):
+        xls = pd.ExcelFile(BytesIO(file_bytes), engine="openpyxl")
     sheets = xls.sheet_names
-    dfs = {sheet: xls.parse(sheet) for sheet in sheets}
+    dfs = {sheet: to_arrow_strings(to_categories(xls.parse(sheet).convert_dtypes())) for sheet in sheets}
     return dfs
 
-def get_unique(df, cols):
+def to_categories(df, max_ratio=0.5):
+    # Low-cardinality string columns become categoricals, so isin() compares integer codes
+    for col in df.select_dtypes(include=["string"]).columns:
+        if len(df) and df[col].nunique() / len(df) < max_ratio:
+            df[col] = df[col].astype("category")
+    return df
+
+def to_arrow_strings(df):
+    # Remaining text columns use Arrow strings, so contains/eq run as Arrow kernels
+    for col in df.select_dtypes(include=["string"]).columns:
+        df[col] = df[col].astype("string[pyarrow]")
+    return df
+
+def as_str(s):
+    # Text categoricals and string columns can be matched as-is; skip the astype(str) copy
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        if s.cat.categories.inferred_type == "string":
+            return s
+    elif isinstance(s.dtype, pd.StringDtype):
+        return s
+    return s.astype(str)
+
+@st.cache_data(show_spinner=False, max_entries=512)
+def _unique_cached(key, cols, _df):
+    return get_unique(_df, list(cols))
+
+@st.cache_resource(show_spinner=False, max_entries=1024)
+def _str_col_cached(key, col, _df):
+    return as_str(_df[col])
+
+def str_col(df, col, key=None):
+    # Cached string view of df[col] for the filters, keyed like get_unique
+    if key is None:
+        return as_str(df[col])
+    return _str_col_cached(key, col, df)
+
+def get_unique(df, cols, key=None):
     if isinstance(cols, str):
         cols = [cols]
-    vals = []
-    for col in cols:
-        if col in df.columns:
-            vals += df[col].dropna().astype(str).tolist()
-    return sorted(set([v.strip() for v in vals if v.strip()]))
-
-def filter_df(df, filters):
-    mask = pd.Series([True] * len(df))
-    for col, selected in filters.items():
-        if col in df.columns and selected:
-            if isinstance(selected, list):
-                mask &= df[col].astype(str).isin(selected)
-            else:
-                mask &= df[col].astype(str).str.contains(selected, case=False, na=False)
-    return df[mask]
+    if key is not None:
+        # key identifies df (workbook hash + sheet), so the frame itself is never hashed
+        return _unique_cached(key, tuple(cols), df)
+    cols = [col for col in cols if col in df.columns]
+    if not cols:
+        return []
+    vals = pd.concat([df[col].dropna().astype(str) for col in cols], ignore_index=True).str.strip()
+    return sorted(vals[vals != ""].unique().tolist())
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def filter_spec(key, cols, _df, max_options=None):
+    # [(idx, col, options, widget)] for every column with 2+ values; idx keeps widget keys stable
+    spec = []
+    for idx, col in enumerate(cols):
+        options = get_unique(_df, col)
+        if len(options) <= 1:
+            continue
+        widget = "multiselect" if max_options is None or len(options) < max_options else "text_input"
+        spec.append((idx, col, options, widget))
+    return spec
+
+def to_parquet(df):
+    # Mixed number/text columns (object, or categoricals with non-string categories) go in as strings
+    mixed = [
+        col for col in df.columns
+        if df[col].dtype == object
+        or (isinstance(df[col].dtype, pd.CategoricalDtype) and df[col].cat.categories.inferred_type != "string")
+    ]
+    return df.astype({col: "string" for col in mixed}).to_parquet(index=False)
+
+def to_xlsx(frames):
+    # {sheet name: DataFrame} -> xlsx, written row by row for xlsxwriter's constant_memory mode
+    buffer = BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {"constant_memory": True, "default_date_format": "yyyy-mm-dd hh:mm:ss"})
+    header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+    for sheet, df in frames.items():
+        worksheet = workbook.add_worksheet(sheet[:31])
+        worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+        values = df.astype(object).where(df.notna(), None)
+        for i, row in enumerate(values.itertuples(index=False, name=None), start=1):
+            worksheet.write_row(i, 0, row)
+    workbook.close()
+    buffer.seek(0)
+    return buffer
+
+def filter_rows(df, filters, key=None, rows=None, searches=None):
+    # Positions of rows passing all picks (isin) and searches (contains), narrowest filter first
+    def narrow(rows, col, match):
+        s = str_col(df, col, key=key)
+        if rows is None:
+            return np.flatnonzero(match(s).to_numpy(dtype=bool))
+        if not len(rows):
+            return rows
+        return rows[match(s.take(rows)).to_numpy(dtype=bool)]
+
+    for col, text in (searches or {}).items():
+        if text and col in df.columns:
+            rows = narrow(rows, col, lambda s: s.str.contains(text, case=False, na=False, regex=False))
+    active = [(col, selected) for col, selected in filters.items() if selected and col in df.columns]
+    for col, selected in sorted(active, key=lambda f: len(f[1])):
+        rows = narrow(rows, col, lambda s: s.isin(selected))
+    return np.arange(len(df)) if rows is None else rows
+
+FILTER_CACHE_SIZE = 16
+
+def sheet_rows(df, df_key, name_search, name_cols, filters, searches):
+    # filter_rows for a sheet tab, with an LRU of recent filter states in session_state
+    state = (
+        df_key,
+        name_search,
+        tuple(sorted((str(col), tuple(sorted(selected))) for col, selected in filters.items() if selected)),
+        tuple(sorted((str(col), text) for col, text in searches.items() if text)),
+    )
+    cache = st.session_state.setdefault("filter_cache", OrderedDict())
+    if state in cache:
+        cache.move_to_end(state)
+        return cache[state]
+    rows = np.flatnonzero(multi_col_name_search(df, name_search, name_cols)) if name_search else None
+    rows = filter_rows(df, filters, key=df_key, rows=rows, searches=searches)
+    cache[state] = rows
+    if len(cache) > FILTER_CACHE_SIZE:
+        cache.popitem(last=False)
+    return rows
 
 def multi_col_name_search(df, search, cols):
     if not search.strip():
-        return pd.Series([True] * len(df))
-    mask = pd.Series([False] * len(df))
+        return np.ones(len(df), dtype=bool)
+    # search is a get_unique value from a selectbox (stripped), so exact equality is enough
+    mask = np.zeros(len(df), dtype=bool)
     for col in cols:
         if col in df.columns:
-            mask |= df[col].astype(str).str.contains(search, case=False, na=False)
+            mask |= as_str(df[col]).str.strip().eq(search).to_numpy(dtype=bool, na_value=False)
     return mask
 
 def val(row, col):
     return str(row.get(col, "")).strip() if pd.notnull(row.get(col, "")) else ""
 
-def location_presence(row, locations):
-    result = []
+def location_presence(df, locations):
+    # "CO in Mumbai, Plant in Pune, ..." for every row of df at once
+    presence = pd.Series("", index=df.index, dtype=object)
     for loc in locations:
-        for suffix in ['CO', 'Branch', 'Plant']:
-            col_name = f"{loc}"
-            if col_name in row and isinstance(row[col_name], str) and suffix in row[col_name]:
-                result.append(f"{suffix} in {loc}")
-    return ", ".join(result)
+        if loc in df.columns:
+            vals = as_str(df[loc])
+            for suffix in ['CO', 'Branch', 'Plant']:
+                hit = vals.str.contains(suffix, regex=False, na=False).to_numpy(dtype=bool)
+                presence[hit] += f", {suffix} in {loc}"
+    return presence.str.removeprefix(", ")
 
 def combine_vals(row, cols, sep=", "):
     return sep.join([val(row, c) for c in cols if val(row, c)])
 
+def combine_cols(df, cols, sep=", "):
+    # combine_vals for every row of df at once
+    out = np.full(len(df), "", dtype=object)
+    for col in cols:
+        if col in df.columns:
+            s = df[col]
+            stripped = as_str(s).str.strip()
+            hit = (s.notna() & stripped.ne("")).to_numpy(dtype=bool, na_value=False)
+            vals = stripped.to_numpy(dtype=object)
+            out[hit] = out[hit] + sep + vals[hit]
+    return pd.Series(out, index=df.index).str.removeprefix(sep)
+
 def card_html(lines):
-    content = ""
-    for label, value in lines:
-        if value:
-            content += f"<strong style='color:#6366f1'>{label}:</strong> <span style='color:#334155'>{value}</span><br>"
-    return f"""
-    <div style="border:2px solid #6366f1;padding:16px 20px 14px 20px;border-radius:12px;margin-bottom:20px;background:linear-gradient(135deg,#f1f5f9 0%,#e0e7ff 100%);color:#000;min-height:120px;box-shadow:0 2px 8px #6366f122;">
-        {content}
-    </div>
-    """
-
-def render_cards(df, card_func, columns_per_row=3):
-    cards = []
-    for _, row in df.iterrows():
-        cards.append(card_func(row))
-    for i in range(0, len(cards), columns_per_row):
-        cols = st.columns(columns_per_row)
-        for j in range(columns_per_row):
-            if i + j < len(cards):
-                with cols[j]:
-                    st.markdown(cards[i + j], unsafe_allow_html=True)
+    content = "".join(
+        f"<strong style='color:#6366f1'>{label}:</strong> <span style='color:#334155'>{value}</span><br>"
+        for label, value in lines if value
+    )
+    # Single line: cards are concatenated into one markdown block, where indented lines would render as code
+    return (
+        '<div style="border:2px solid #6366f1;padding:16px 20px 14px 20px;border-radius:12px;margin-bottom:20px;background:linear-gradient(135deg,#f1f5f9 0%,#e0e7ff 100%);color:#000;min-height:120px;box-shadow:0 2px 8px #6366f122;">'
+        f"{content}"
+        "</div>"
+    )
 
-# --- PDF Export with ReportLab ---
+def render_cards(df, card_func, columns_per_row=3, page_size=60, key="cards"):
+    # Only one page of cards is built and sent to the browser; the page is kept per key (tab)
+    page_key = f"{key}_page"
+    pages = max(1, -(-len(df) // page_size))
+    page = min(st.session_state.get(page_key, 0), pages - 1)
+    start = page * page_size
+    if pages > 1:
+        prev_col, info_col, next_col = st.columns([1, 4, 1])
+        prev_col.button("Prev", key=f"{key}_prev", disabled=page == 0,
+                        on_click=lambda: st.session_state.update({page_key: page - 1}))
+        info_col.caption(f"Page {page + 1} of {pages} (cards {start + 1}-{min(start + page_size, len(df))} of {len(df)})")
+        next_col.button("Next", key=f"{key}_next", disabled=page == pages - 1,
+                        on_click=lambda: st.session_state.update({page_key: page + 1}))
+    df = df.iloc[start:start + page_size]
+
+    # Plain dicts per row: card functions only need row.get, and iterrows boxes every row in a Series
+    rows = with_card_columns(df, card_func).to_dict("records")
+    cards = "".join(card_func(row) for row in rows)
+    # One CSS grid in a single markdown element instead of st.columns + one element per card
+    st.markdown(
+        f'<div style="display:grid;grid-template-columns:repeat({columns_per_row},minmax(0,1fr));gap:0 16px">{cards}</div>',
+        unsafe_allow_html=True
+    )
 
-def download_pdf_reportlab(filtered_df, card_func, filename="contacts.pdf"):
-    if filtered_df.empty:
-        return BytesIO()
-    first_row = filtered_df.iloc[0]
-    card_lines = card_func(first_row, as_lines=True)
-    card_fields = [label for label, value in card_lines]
+# --- PDF Export with ReportLab ---
 
+# Styles are immutable once built, so they are shared by every export instead of rebuilt per call
+CELL_STYLE = ParagraphStyle(
+    'cell',
+    fontSize=7,
+    leading=9,
+    wordWrap='CJK',  # enables wrapping for long words
+    alignment=0,     # left
+    spaceAfter=2,
+)
+HEADER_STYLE = ParagraphStyle(
+    'header',
+    fontSize=7.5,
+    leading=10,
+    alignment=0,
+    spaceAfter=2,
+    fontName='Helvetica-Bold'
+)
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 7),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 4),
+    ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ('BOX', (0, 0), (-1, -1), 0.5, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+])
+
+def build_rows_lines(df, card_func):
+    # PDF header labels (from the first card) and cell text per row, one card_func call per row
+    records = with_card_columns(df, card_func).to_dict("records")
+    rows_lines = [dict(card_func(row, as_lines=True)) for row in records]
+    card_fields = list(rows_lines[0]) if rows_lines else []
+    rows = [[str(lines.get(field, "")) for field in card_fields] for lines in rows_lines]
+    return card_fields, rows
+
+PAGE_SIZES = {"portrait": A4, "landscape": landscape(A4)}
+
+def pdf_section(card_fields, rows):
     # Decide orientation based on number of columns
     if len(card_fields) > 8:
-        page_size = landscape(A4)
+        orientation = "landscape"
         total_width_mm = 297 - 20 - 20  # A4 landscape width - margins
     else:
-        page_size = A4
+        orientation = "portrait"
         total_width_mm = 210 - 20 - 20  # A4 portrait width - margins
 
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=page_size,
-        rightMargin=20,
-        leftMargin=20,
-        topMargin=20,
-        bottomMargin=20
-    )
-    styles = getSampleStyleSheet()
-    cell_style = ParagraphStyle(
-        'cell',
-        fontSize=7,
-        leading=9,
-        wordWrap='CJK',  # enables wrapping for long words
-        alignment=0,     # left
-        spaceAfter=2,
-    )
-    header_style = ParagraphStyle(
-        'header',
-        fontSize=7.5,
-        leading=10,
-        alignment=0,
-        spaceAfter=2,
-        fontName='Helvetica-Bold'
-    )
     story = []
 
     # --- Add logo at the top ---
@@ -136,49 +286,72 @@ def download_pdf_reportlab(filtered_df, card_func, filename="contacts.pdf"):
         story.append(Spacer(1, 12))  # Add some space after the logo
 
     # Prepare table data: header + rows (with Paragraph for wrapping)
-    table_data = [[Paragraph(str(field), header_style) for field in card_fields]]
-    for _, row in filtered_df.iterrows():
-        lines = dict(card_func(row, as_lines=True))
-        row_data = [Paragraph(str(lines.get(field, "")), cell_style) for field in card_fields]
-        table_data.append(row_data)
+    table_data = [[Paragraph(str(field), HEADER_STYLE) for field in card_fields]]
+    table_data += [[Paragraph(cell, CELL_STYLE) for cell in row] for row in rows]
 
     # Calculate column widths to fit page width
     col_width = total_width_mm / len(card_fields)
     col_widths = [col_width * mm for _ in card_fields]
 
-    table = Table(table_data, repeatRows=1, colWidths=col_widths)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 7),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 4),
-        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
-        ('BOX', (0, 0), (-1, -1), 0.5, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
+    # LongTable lays out large row counts page by page instead of sizing the whole table up front
+    table = LongTable(table_data, repeatRows=1, colWidths=col_widths, splitByRow=True)
+    table.setStyle(TABLE_STYLE)
     story.append(table)
+    return orientation, story
+
+def build_pdf(sections):
+    # One PDF for any number of (card_fields, rows) sections, each on new pages in its own orientation
+    buffer = BytesIO()
+    sections = [pdf_section(card_fields, rows) for card_fields, rows in sections if rows]
+    if not sections:
+        return buffer
+
+    first_orientation = sections[0][0]
+    doc = BaseDocTemplate(
+        buffer,
+        pagesize=PAGE_SIZES[first_orientation],
+        rightMargin=20,
+        leftMargin=20,
+        topMargin=20,
+        bottomMargin=20
+    )
+    templates = [
+        PageTemplate(id=orientation, frames=[Frame(20, 20, width - 40, height - 40)], pagesize=(width, height))
+        for orientation, (width, height) in PAGE_SIZES.items()
+    ]
+    # The first page uses the first template
+    templates.sort(key=lambda template: template.id != first_orientation)
+    doc.addPageTemplates(templates)
+
+    story = []
+    for i, (orientation, flowables) in enumerate(sections):
+        if i:
+            story += [NextPageTemplate(orientation), PageBreak()]
+        story += flowables
 
     doc.build(story)
     buffer.seek(0)
     return buffer
 
+def download_pdf_reportlab(card_fields, rows, filename="contacts.pdf"):
+    return build_pdf([(card_fields, rows)])
+
 # --- Card Layouts for Each Tab ---
 
+LISTED_LOCATIONS = ["Agra", "Mumbai", "NCR", "Chennai", "Vadodara", "Bangalore", "Pune", "Kolkata", "Hyderabad", "Ahmedabad"]
+
 def listed_companies_card(row, as_lines=False):
-    locations = ["Agra", "Mumbai", "NCR", "Chennai", "Vadodara", "Bangalore", "Pune", "Kolkata", "Hyderabad", "Ahmedabad"]
-    ceo_designation = combine_vals(row, ['CEO Name ', 'Designation'], ", ")
-    company_bloomberg = combine_vals(row, ['Corporate Name', 'Bloomberg Code'], ", ")
-    sector_subsector = combine_vals(row, ['Sector', 'Sub Sector'], ", ")
-    analyst_team = combine_vals(row, ['Relevant Analyst Team (Sector Wise)'], ", ")
-    analyst_location = combine_vals(row, ['Head Office'], ", ")
+    ceo_designation = val(row, "_ceo_designation")
+    company_bloomberg = val(row, "_company_bloomberg")
+    sector_subsector = val(row, "_sector_subsector")
+    analyst_team = val(row, 'Relevant Analyst Team (Sector Wise)')
+    analyst_location = val(row, 'Head Office')
     analyst_team_and_loc = f"{analyst_team}, {analyst_location}".strip()
-    cfo_designation = combine_vals(row, ['CFO Connects', 'Designation.1'], ", ")
+    cfo_designation = val(row, "_cfo_designation")
     
 
 
-    loc_presence = location_presence(row, locations)
+    loc_presence = val(row, "_loc_presence")
     lines = [
         ("CEO & Designation", ceo_designation),
         ("CEO City", val(row, 'CEO City')),
@@ -196,8 +369,8 @@ def listed_companies_card(row, as_lines=False):
 def expert_confirmed_card(row, as_lines=False):
     name = val(row, "Name")
     designation = val(row, "Designation")
-    sector_segment = combine_vals(row, ['Sector', 'Segments'], " ")
-    company_desc = combine_vals(row, ['Company', 'Description'], ", ")
+    sector_segment = val(row, "_sector_segment")
+    company_desc = val(row, "_company_desc")
     city = val(row, "Location")
     
     lines = [
@@ -215,8 +388,8 @@ def expert_confirmed_card(row, as_lines=False):
 def expert_potential_card(row, as_lines=False):
     name = val(row, "Name")
     designation = val(row, "Designation")
-    sector_segment = combine_vals(row, ['Sector', 'Segment'], " ")
-    company_desc = combine_vals(row, ['Company', 'Description'], ", ")
+    sector_segment = val(row, "_sector_segment")
+    company_desc = val(row, "_company_desc")
     city = val(row, "Location")
     
     lines = [
@@ -233,8 +406,8 @@ def expert_potential_card(row, as_lines=False):
 
 def channel_checks_card(row, as_lines=False):
     name = val(row, "Name")
-    sector_subsector = combine_vals(row, ['Sector', 'Sub Sector'], " - ")
-    state_city = combine_vals(row, ['State', 'Location'], " ")
+    sector_subsector = val(row, "_sector_subsector")
+    state_city = val(row, "_state_city")
     designation = val(row, "Designation / Area of Expertise")
     
     lines = [
@@ -251,7 +424,7 @@ def channel_checks_card(row, as_lines=False):
 def ir_data_card(row, as_lines=False):
     bloomberg_code = val(row, "Bloomberg Code")
     full_name = val(row, "Full Name")
-    sector_subsector = combine_vals(row, ['Sector', 'Sub Sector'], ", ")
+    sector_subsector = val(row, "_sector_subsector")
     ir_agency = val(row, "IR Agency")
     
     lines = [
@@ -270,7 +443,7 @@ def ministry_contacts_card(row, as_lines=False):
     sector = val(row, "Sector")
     department = val(row, "Department")
     address = val(row, "Address")
-    email_phone = combine_vals(row, ['Email', 'Phone Number'], ", ")
+    email_phone = val(row, "_email_phone")
     
     lines = [
         ("Name", name),
@@ -298,9 +471,149 @@ def generic_card(row, columns, as_lines=False):
         return lines
     return card_html(lines)
 
+# Sheet-name keyword -> card function, checked in order; unmatched sheets get generic_card
+CARD_FUNCS = {
+    "listed companies": listed_companies_card,
+    "expert confirmed": expert_confirmed_card,
+    "expert potential": expert_potential_card,
+    "channel checks": channel_checks_card,
+    "ir data": ir_data_card,
+    "ministry contacts": ministry_contacts_card,
+}
+
+def pick_card(sheet, columns):
+    sheet_lower = sheet.lower()
+    card_func = next((f for key, f in CARD_FUNCS.items() if key in sheet_lower), None)
+    if card_func is None:
+        return lambda row, as_lines=False: generic_card(row, columns[:8], as_lines=as_lines)
+    return card_func
+
+# Sidebar filters per sheet keyword (same order as CARD_FUNCS); "extra" maps widget key -> candidate columns
+SHEET_FILTERS = {
+    "listed companies": {
+        "prefix": "lc",
+        "name": ("Name Search", ['CEO Name ', 'CFO Connects', 'Relevant Analyst Team Sector Wise']),
+        "fields": {
+            "Corporate Name": "Corporate Name",
+            "Bloomberg Code": "Bloomberg Code",
+            "Sector": "Sector",
+            "Coverage": "Coverage",
+            "SEBI Classification": "SEBI Classification",
+            "Relation lead": "Relation lead (Research / Corp Access / IB / IR Agency / Parent / Sales)",
+            "Head Office": "Head Office",
+        },
+    },
+    "expert confirmed": {
+        "prefix": "ec",
+        "name": ("Name", ["Name"]),
+        "extra": {"ec_designation": ("Designation",), "ec_city": ("Location",)},
+        "fields": {"Sector": "Sector", "Segment": "Segments", "Company": "Company", "Description": "Description"},
+    },
+    "expert potential": {
+        "prefix": "ep",
+        "name": ("Name", ["Name"]),
+        "extra": {"ep_designation": ("Designation",), "ep_city": ("Location",)},
+        "fields": {"Sector": "Sector", "Segment": "Segment", "Company": "Company", "Description": "Description"},
+    },
+    "channel checks": {
+        "prefix": "cc",
+        "name": ("Name", ["Name"]),
+        "extra": {
+            "cc_sector": ("Sector",),
+            "cc_sub_sector": ("Sub Sector",),
+            "cc_state": ("State",),
+            "cc_city": ("Location",),
+            "cc_designation": ("Designation / Area of Expertise", "Designation"),
+        },
+    },
+    "ir data": {"prefix": "ir", "fields": "all"},
+    "ministry contacts": {"prefix": "mc", "fields": "all"},
+}
+# Any other sheet: every column, as a text search when it has 100+ distinct values
+GENERIC_FILTERS = {"prefix": "gen", "fields": "all", "max_options": 100}
+
+def first_column(df, candidates):
+    # The first candidate column the sheet has, else the last one (an empty multiselect)
+    return next((col for col in candidates if col in df.columns), candidates[-1])
+
+def sidebar_filters(df, df_key, layout):
+    # Draws a sheet's sidebar; returns (name search, name columns, picks, searches)
+    prefix = layout["prefix"]
+    name_search, name_cols = "", []
+    if "name" in layout:
+        label, name_cols = layout["name"]
+        name_suggestions = get_unique(df, name_cols, key=df_key)
+        name_search = st.sidebar.selectbox(label, [""] + name_suggestions, key=f"{prefix}_name_search")
+    filters, searches = {}, {}
+    for widget_key, candidates in layout.get("extra", {}).items():
+        col = first_column(df, candidates)
+        filters[col] = st.sidebar.multiselect(col, get_unique(df, col, key=df_key), key=widget_key)
+    fields = layout.get("fields", {})
+    if fields == "all":
+        spec = filter_spec(df_key, tuple(df.columns), df, max_options=layout.get("max_options"))
+        if len(spec) < len(df.columns):
+            st.sidebar.caption("Columns with a single value (or none) have no filter.")
+        for idx, col, options, widget in spec:
+            if widget == "multiselect":
+                filters[col] = st.sidebar.multiselect(col, options, default=[], key=f"{prefix}_{col}_filter_{idx}")
+            else:
+                searches[col] = st.sidebar.text_input(col, key=f"{prefix}_{col}_input_{idx}")
+    else:
+        for idx, (label, col) in enumerate(fields.items()):
+            options = get_unique(df, col, key=df_key)
+            filters[col] = st.sidebar.multiselect(label, options, default=[], key=f"{prefix}_{col}_filter_{idx}")
+    return name_search, name_cols, filters, searches
+
+# Derived columns each card reads, computed once per frame before rendering cards or PDFs
+CARD_COLUMNS = {
+    listed_companies_card: {
+        "_ceo_designation": lambda df: combine_cols(df, ['CEO Name ', 'Designation'], ", "),
+        "_company_bloomberg": lambda df: combine_cols(df, ['Corporate Name', 'Bloomberg Code'], ", "),
+        "_sector_subsector": lambda df: combine_cols(df, ['Sector', 'Sub Sector'], ", "),
+        "_cfo_designation": lambda df: combine_cols(df, ['CFO Connects', 'Designation.1'], ", "),
+        "_loc_presence": lambda df: location_presence(df, LISTED_LOCATIONS),
+    },
+    expert_confirmed_card: {
+        "_sector_segment": lambda df: combine_cols(df, ['Sector', 'Segments'], " "),
+        "_company_desc": lambda df: combine_cols(df, ['Company', 'Description'], ", "),
+    },
+    expert_potential_card: {
+        "_sector_segment": lambda df: combine_cols(df, ['Sector', 'Segment'], " "),
+        "_company_desc": lambda df: combine_cols(df, ['Company', 'Description'], ", "),
+    },
+    channel_checks_card: {
+        "_sector_subsector": lambda df: combine_cols(df, ['Sector', 'Sub Sector'], " - "),
+        "_state_city": lambda df: combine_cols(df, ['State', 'Location'], " "),
+    },
+    ir_data_card: {
+        "_sector_subsector": lambda df: combine_cols(df, ['Sector', 'Sub Sector'], ", "),
+    },
+    ministry_contacts_card: {
+        "_email_phone": lambda df: combine_cols(df, ['Email', 'Phone Number'], ", "),
+    },
+}
+
+def with_card_columns(df, card_func):
+    derived = CARD_COLUMNS.get(card_func, {})
+    return df.assign(**{name: make(df) for name, make in derived.items()}) if derived else df
+
+def sheets_pdf(frames):
+    # {sheet name: DataFrame} -> one PDF, a section per sheet in that sheet's card layout
+    return build_pdf([build_rows_lines(df, pick_card(sheet, df.columns)) for sheet, df in frames.items()])
+
 # --- All Sheet Dashboard ---
 
-def all_dashboard(dfs):
+# cache_resource avoids a pickle copy per rerun; all_df is never mutated
+@st.cache_resource(show_spinner=False, max_entries=4)
+def concat_sheets(workbook_key, _dfs):
+    # _sheet is built from codes as a categorical, instead of copying every sheet through assign()
+    all_df = pd.concat(_dfs.values(), ignore_index=True)
+    all_df["_sheet"] = pd.Categorical.from_codes(
+        np.repeat(np.arange(len(_dfs)), [len(df) for df in _dfs.values()]), categories=list(_dfs)
+    )
+    return all_df
+
+def all_dashboard(dfs, workbook_key):
     st.header("All Sheets Dashboard")
     total_contacts = sum([len(df) for df in dfs.values()])
     st.metric("Total Contacts", total_contacts)
@@ -312,7 +625,7 @@ def all_dashboard(dfs):
     st.metric("⭐ Expert Potential", sheet_counts.get('expert potential', 0))
 
     # Concatenate all data
-    all_df = pd.concat([df.assign(_sheet=sheet) for sheet, df in dfs.items()], ignore_index=True)
+    all_df = concat_sheets(workbook_key, dfs)
     sheet_names = list(dfs.keys())
 
     # Sidebar filters
@@ -327,9 +640,9 @@ def all_dashboard(dfs):
             if "market cap" in c.lower():
                 market_cap_col = c
                 break
-        name_suggestions = get_unique(all_df, name_cols)
-        sector_suggestions = get_unique(all_df, sector_col)
-        market_cap_suggestions = get_unique(all_df, market_cap_col) if market_cap_col else []
+        name_suggestions = get_unique(all_df, name_cols, key=(workbook_key, "*"))
+        sector_suggestions = get_unique(all_df, sector_col, key=(workbook_key, "*"))
+        market_cap_suggestions = get_unique(all_df, market_cap_col, key=(workbook_key, "*")) if market_cap_col else []
         name_search = st.selectbox("Name Search", [""] + name_suggestions, key="all_name_search")
         sector_search = st.multiselect("Sector", sector_suggestions, key="all_sector_search")
         if market_cap_col:
@@ -338,7 +651,7 @@ def all_dashboard(dfs):
             market_cap_search = []
         # Location-wise filter (searches all location-like columns)
         location_cols = [c for c in all_df.columns if any(x in c.lower() for x in ["location", "city", "state", "address"])]
-        location_suggestions = get_unique(all_df, location_cols)
+        location_suggestions = get_unique(all_df, location_cols, key=(workbook_key, "*"))
         location_search = st.multiselect("Location Search (All Tabs)", location_suggestions, key="all_location_search")  # <-- changed to multiselect
 
     # Filter by selected sheets
@@ -346,48 +659,48 @@ def all_dashboard(dfs):
         dfs = {sheet: dfs[sheet] for sheet in selected_sheets}
         all_df = all_df[all_df["_sheet"].isin(selected_sheets)].reset_index(drop=True)
 
-    # If any filter is used, filter each sheet and show results grouped by sheet
+    # If any filter is used, filter all sheets in one pass over all_df and show results grouped by sheet
     if name_search or sector_search or (market_cap_col and market_cap_search) or location_search:
         st.write("Showing filtered contacts grouped by sheet:")
+        active = []  # (columns the filter reads, rows it matches)
+
+        # Name filter
+        if name_search and name_cols:
+            active.append((name_cols, multi_col_name_search(all_df, name_search, name_cols)))
+
+        # Sector filter (partial match for any selected sector)
+        if sector_search:
+            sector_vals = as_str(all_df[sector_col])
+            active.append(([sector_col], np.logical_or.reduce(
+                [sector_vals.str.contains(sector, case=False, na=False).to_numpy(dtype=bool) for sector in sector_search]
+            )))
+
+        # Market Cap filter
+        if market_cap_col and market_cap_search:
+            active.append(([market_cap_col], as_str(all_df[market_cap_col]).isin(market_cap_search).to_numpy(dtype=bool)))
+
+        # Location filter
+        if location_search and location_cols:
+            active.append((location_cols, np.logical_or.reduce(
+                [as_str(all_df[col]).str.contains(loc, case=False, na=False).to_numpy(dtype=bool)
+                 for col in location_cols for loc in location_search]
+            )))
+
+        # Filters apply only to sheets having their columns; keep rows where all applicable filters matched
+        keep = np.ones(len(all_df), dtype=bool)
+        applied = np.zeros(len(all_df), dtype=bool)
+        for cols, matched in active:
+            sheets_with_cols = [sheet for sheet, df in dfs.items() if any(c in df.columns for c in cols)]
+            applicable = all_df["_sheet"].isin(sheets_with_cols).to_numpy()
+            keep &= matched | ~applicable
+            applied |= applicable
+        keep &= applied
+
         filtered_dfs = {}
+        rows_by_sheet = all_df.groupby("_sheet", sort=False, observed=True).indices
         for sheet, df in dfs.items():
-            mask = pd.Series([True] * len(df))
-            filter_applied = False  # Track if any filter is applied to this sheet
-
-            # Name filter
-            if name_search:
-                name_cols_sheet = [c for c in df.columns if "name" in c.lower()]
-                if name_cols_sheet:
-                    mask &= multi_col_name_search(df, name_search, name_cols_sheet)
-                    filter_applied = True
-
-            # Sector filter (partial match for any selected sector)
-            if sector_search and sector_col in df.columns:
-                mask_sector = pd.Series([False] * len(df))
-                for sector in sector_search:
-                    mask_sector |= df[sector_col].astype(str).str.contains(sector, case=False, na=False)
-                mask &= mask_sector
-                filter_applied = True
-
-            # Market Cap filter
-            if market_cap_col and market_cap_col in df.columns and market_cap_search:
-                mask &= df[market_cap_col].astype(str).isin(market_cap_search)
-                filter_applied = True
-
-            # Location filter
-            if location_search:
-                loc_cols = [c for c in df.columns if any(x in c.lower() for x in ["location", "city", "state", "address"])]
-                if loc_cols:
-                    mask_loc = pd.Series([False] * len(df))
-                    for col in loc_cols:
-                        for loc in location_search:
-                            mask_loc |= df[col].astype(str).str.contains(loc, case=False, na=False)
-                    mask &= mask_loc
-                    filter_applied = True
-
-            filtered_df = df[mask]
-            # Only show if a filter was actually applied to this sheet and results are not empty
-            if filter_applied and not filtered_df.empty:
+            filtered_df = df.iloc[np.flatnonzero(keep[rows_by_sheet.get(sheet, [])])]
+            if not filtered_df.empty:
                 st.subheader(f"{sheet} ({len(filtered_df)})")
                 st.dataframe(filtered_df)
                 filtered_dfs[sheet] = filtered_df
@@ -400,52 +713,20 @@ def all_dashboard(dfs):
                 horizontal=True,
                 key="download_option"
             )
+            # Exports are passed as callables, so they are only built when the button is clicked
             if download_option == "All Selected Sheets (Combined)":
                 # Excel download (separate sheets)
-                excel_bytes = BytesIO()
-                with pd.ExcelWriter(excel_bytes, engine="xlsxwriter") as writer:
-                    for sheet, df in filtered_dfs.items():
-                        df.to_excel(writer, sheet_name=sheet[:31], index=False)
-                excel_bytes.seek(0)
                 st.download_button(
                     "Download All Filtered as Excel (Separate Sheets)",
-                    data=excel_bytes,
+                    data=lambda: to_xlsx(filtered_dfs),
                     file_name="filtered_contacts_by_sheet.xlsx",
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                 )
 
                 # PDF download (all sheets, one after another)
-                pdf_buffers = []
-                for sheet, df in filtered_dfs.items():
-                    # Choose the right card function for each sheet if needed
-                    card_func = generic_card
-                    if "listed companies" in sheet.lower():
-                        card_func = listed_companies_card
-                    elif "expert confirmed" in sheet.lower():
-                        card_func = expert_confirmed_card
-                    elif "expert potential" in sheet.lower():
-                        card_func = expert_potential_card
-                    elif "channel checks" in sheet.lower():
-                        card_func = channel_checks_card
-                    elif "ir data" in sheet.lower():
-                        card_func = ir_data_card
-                    elif "ministry contacts" in sheet.lower():
-                        card_func = ministry_contacts_card
-
-                    pdf_buffer = download_pdf_reportlab(df, card_func)
-                    pdf_buffers.append((sheet, pdf_buffer.read()))
-                # Combine PDFs (simple concatenation, works for most viewers)
-                from PyPDF2 import PdfMerger
-                merger = PdfMerger()
-                for sheet, pdf_bytes in pdf_buffers:
-                    merger.append(BytesIO(pdf_bytes))
-                merged_pdf = BytesIO()
-                merger.write(merged_pdf)
-                merger.close()
-                merged_pdf.seek(0)
                 st.download_button(
                     "Download All Filtered as PDF (Combined)",
-                    data=merged_pdf,
+                    data=lambda: sheets_pdf(filtered_dfs),
                     file_name="filtered_contacts_by_sheet.pdf",
                     mime="application/pdf"
                 )
@@ -458,50 +739,19 @@ def all_dashboard(dfs):
                     key="sheet_download_select"
                 )
                 if sheet_to_download:
+                    selected_dfs = {sheet: filtered_dfs[sheet] for sheet in sheet_to_download}
                     # Excel download (selected sheets)
-                    excel_bytes = BytesIO()
-                    with pd.ExcelWriter(excel_bytes, engine="xlsxwriter") as writer:
-                        for sheet in sheet_to_download:
-                            filtered_dfs[sheet].to_excel(writer, sheet_name=sheet[:31], index=False)
-                    excel_bytes.seek(0)
                     st.download_button(
                         "Download Selected Sheets as Excel (Separate Sheets)",
-                        data=excel_bytes,
+                        data=lambda: to_xlsx(selected_dfs),
                         file_name="filtered_contacts_selected_sheets.xlsx",
                         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                     )
 
                     # PDF download (selected sheets)
-                    pdf_buffers = []
-                    for sheet in sheet_to_download:
-                        df = filtered_dfs[sheet]
-                        card_func = generic_card
-                        if "listed companies" in sheet.lower():
-                            card_func = listed_companies_card
-                        elif "expert confirmed" in sheet.lower():
-                            card_func = expert_confirmed_card
-                        elif "expert potential" in sheet.lower():
-                            card_func = expert_potential_card
-                        elif "channel checks" in sheet.lower():
-                            card_func = channel_checks_card
-                        elif "ir data" in sheet.lower():
-                            card_func = ir_data_card
-                        elif "ministry contacts" in sheet.lower():
-                            card_func = ministry_contacts_card
-
-                        pdf_buffer = download_pdf_reportlab(df, card_func)
-                        pdf_buffers.append((sheet, pdf_buffer.read()))
-                    from PyPDF2 import PdfMerger
-                    merger = PdfMerger()
-                    for sheet, pdf_bytes in pdf_buffers:
-                        merger.append(BytesIO(pdf_bytes))
-                    merged_pdf = BytesIO()
-                    merger.write(merged_pdf)
-                    merger.close()
-                    merged_pdf.seek(0)
                     st.download_button(
                         "Download Selected Sheets as PDF (Combined)",
-                        data=merged_pdf,
+                        data=lambda: sheets_pdf(selected_dfs),
                         file_name="filtered_contacts_selected_sheets.pdf",
                         mime="application/pdf"
                     )
@@ -510,10 +760,7 @@ def all_dashboard(dfs):
     # If no filter, show all
     st.write(f"Showing {len(all_df)} contacts")
     st.dataframe(all_df)
-    excel_bytes = BytesIO()
-    all_df.to_excel(excel_bytes, index=False)
-    excel_bytes.seek(0)
-    st.download_button("Download All as Excel", data=excel_bytes, file_name="all_contacts.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    st.download_button("Download All as Excel", data=lambda: to_xlsx({"Sheet1": all_df}), file_name="all_contacts.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
 
 # --- Streamlit App ---
 
@@ -550,7 +797,9 @@ st.markdown("""
 uploaded_file = st.file_uploader("Upload Excel file", type=["xlsx"])
 
 if uploaded_file:
-    dfs = load_excel(uploaded_file)
+    file_bytes = uploaded_file.getvalue()
+    dfs = load_excel(file_bytes)
+    workbook_key = hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
     sheet_names = list(dfs.keys())
     st.sidebar.header("Sheet Selection")
     select_options = ["All"] + sheet_names
@@ -559,183 +808,42 @@ if uploaded_file:
     pdf_bytes = None
 
     if selected_sheet == "All":
-        all_dashboard(dfs)
+        all_dashboard(dfs, workbook_key)
     else:
         df = dfs[selected_sheet]
+        df_key = (workbook_key, selected_sheet)
         tab = selected_sheet.lower()
         st.sidebar.header("Filters")
-        filters = {}
-
-        if "listed companies" in tab:
-            name_cols = ['CEO Name ', 'CFO Connects', 'Relevant Analyst Team Sector Wise']
-            name_suggestions = get_unique(df, name_cols)
-            name_search = st.sidebar.selectbox("Name Search", [""] + name_suggestions, key="lc_name_search")
-            filter_fields = {
-                "Corporate Name": "Corporate Name",
-                "Bloomberg Code": "Bloomberg Code",
-                "Sector": "Sector",
-                "Coverage": "Coverage",
-                "SEBI Classification": "SEBI Classification",
-                "Relation lead": "Relation lead (Research / Corp Access / IB / IR Agency / Parent / Sales)",
-                "Head Office": "Head Office",
-            }
-            for idx, (label, col) in enumerate(filter_fields.items()):
-                options = get_unique(df, col)
-                filters[col] = st.sidebar.multiselect(label, options, default=[], key=f"lc_{col}_filter_{idx}")
-            mask = pd.Series([True] * len(df))
-            if name_search:
-                mask &= multi_col_name_search(df, name_search, name_cols)
-            for col, selected in filters.items():
-                if col in df.columns and selected:
-                    mask &= df[col].astype(str).isin(selected)
-            filtered_df = df[mask]
-            card_func = listed_companies_card
-
-        elif "expert confirmed" in tab:
-            name_suggestions = get_unique(df, "Name")
-            name_search = st.sidebar.selectbox("Name", [""] + name_suggestions, key="ec_name_search")
-            designation_suggestions = get_unique(df, "Designation")
-            designation_search = st.sidebar.multiselect("Designation", designation_suggestions, key="ec_designation")
-            city_suggestions = get_unique(df, "Location")
-            city_search = st.sidebar.multiselect("Location", city_suggestions, key="ec_city")
-            filter_fields = {
-                "Sector": "Sector",
-                "Segment": "Segments",
-                "Company": "Company",
-                "Description": "Description"
-            }
-            for idx, (label, col) in enumerate(filter_fields.items()):
-                options = get_unique(df, col)
-                filters[col] = st.sidebar.multiselect(label, options, default=[], key=f"ec_{col}_filter_{idx}")
-            mask = pd.Series([True] * len(df))
-            if name_search:
-                mask &= df["Name"].astype(str) == name_search
-            if designation_search and "Designation" in df.columns:
-                mask &= df["Designation"].astype(str).isin(designation_search)
-            if city_search and "Location" in df.columns:
-                mask &= df["Location"].astype(str).isin(city_search)  # <-- FIXED: use "Location" not "City"
-            for col, selected in filters.items():
-                if col in df.columns and selected:
-                    mask &= df[col].astype(str).isin(selected)
-            filtered_df = df[mask]
-            card_func = expert_confirmed_card
-
-        elif "expert potential" in tab:
-            name_suggestions = get_unique(df, "Name")
-            name_search = st.sidebar.selectbox("Name", [""] + name_suggestions, key="ep_name_search")
-            designation_suggestions = get_unique(df, "Designation")
-            designation_search = st.sidebar.multiselect("Designation", designation_suggestions, key="ep_designation")
-            city_suggestions = get_unique(df, "Location")
-            city_search = st.sidebar.multiselect("Location", city_suggestions, key="ep_city")
-            filter_fields = {
-                "Sector": "Sector",
-                "Segment": "Segment",
-                "Company": "Company",
-                "Description": "Description"
-            }
-            for idx, (label, col) in enumerate(filter_fields.items()):
-                options = get_unique(df, col)
-                filters[col] = st.sidebar.multiselect(label, options, default=[], key=f"ep_{col}_filter_{idx}")
-            mask = pd.Series([True] * len(df))
-            if name_search:
-                mask &= df["Name"].astype(str) == name_search
-            if designation_search and "Designation" in df.columns:
-                mask &= df["Designation"].astype(str).isin(designation_search)
-            if city_search and "Location" in df.columns:
-                mask &= df["Location"].astype(str).isin(city_search)
-            for col, selected in filters.items():
-                if col in df.columns and selected:
-                    mask &= df[col].astype(str).isin(selected)
-            filtered_df = df[mask]
-            card_func = expert_potential_card
-
-        elif "channel checks" in tab:
-            name_suggestions = get_unique(df, "Name")
-            name_search = st.sidebar.selectbox("Name", [""] + name_suggestions, key="cc_name_search")
-            sector_suggestions = get_unique(df, "Sector")
-            sector_search = st.sidebar.multiselect("Sector", sector_suggestions, key="cc_sector")
-            sub_sector_suggestions = get_unique(df, "Sub Sector")
-            sub_sector_search = st.sidebar.multiselect("Sub Sector", sub_sector_suggestions, key="cc_sub_sector")
-            state_suggestions = get_unique(df, "State")
-            state_search = st.sidebar.multiselect("State", state_suggestions, key="cc_state")
-            city_suggestions = get_unique(df, "Location")
-            city_search = st.sidebar.multiselect("Location", city_suggestions, key="cc_city")
-            designation_col = "Designation / Area of Expertise" if "Designation / Area of Expertise" in df.columns else "Designation"
-            designation_suggestions = get_unique(df, designation_col)
-            designation_search = st.sidebar.multiselect(designation_col, designation_suggestions, key="cc_designation")
-            mask = pd.Series([True] * len(df))
-            if name_search:
-                mask &= df["Name"].astype(str) == name_search
-            if sector_search and "Sector" in df.columns:
-                mask &= df["Sector"].astype(str).isin(sector_search)
-            if sub_sector_search and "Sub Sector" in df.columns:
-                mask &= df["Sub Sector"].astype(str).isin(sub_sector_search)
-            if state_search and "State" in df.columns:
-                mask &= df["State"].astype(str).isin(state_search)
-            if city_search and "Location" in df.columns:
-                mask &= df["Location"].astype(str).isin(city_search)
-            if designation_search and designation_col in df.columns:
-                mask &= df[designation_col].astype(str).isin(designation_search)
-            filtered_df = df[mask]
-            card_func = channel_checks_card
-
-        elif "ir data" in tab:
-            filter_fields = {col: col for col in df.columns}
-            for idx, (label, col) in enumerate(filter_fields.items()):
-                options = get_unique(df, col)
-                filters[col] = st.sidebar.multiselect(label, options, default=[], key=f"ir_{col}_filter_{idx}")
-            mask = pd.Series([True] * len(df))
-            for col, selected in filters.items():
-                if col in df.columns and selected:
-                    mask &= df[col].astype(str).isin(selected)
-            filtered_df = df[mask]
-            card_func = ir_data_card
-
-        elif "ministry contacts" in tab:
-            filter_fields = {col: col for col in df.columns}
-            for idx, (label, col) in enumerate(filter_fields.items()):
-                options = get_unique(df, col)
-                filters[col] = st.sidebar.multiselect(label, options, default=[], key=f"mc_{col}_filter_{idx}")
-            mask = pd.Series([True] * len(df))
-            for col, selected in filters.items():
-                if col in df.columns and selected:
-                    mask &= df[col].astype(str).isin(selected)
-            filtered_df = df[mask]
-            card_func = ministry_contacts_card
+        filter_layout = next((layout for keyword, layout in SHEET_FILTERS.items() if keyword in tab), GENERIC_FILTERS)
+        name_search, name_cols, filters, searches = sidebar_filters(df, df_key, filter_layout)
+        filtered_df = df.take(sheet_rows(df, df_key, name_search, name_cols, filters, searches))
+        card_func = pick_card(selected_sheet, df.columns)
 
-        else:
-            filter_fields = {col: col for col in df.columns}
-            for idx, (label, col) in enumerate(filter_fields.items()):
-                options = get_unique(df, col)
-                if len(options) > 1 and len(options) < 100:
-                    filters[col] = st.sidebar.multiselect(label, options, default=[], key=f"gen_{col}_filter_{idx}")
-                else:
-                    filters[col] = st.sidebar.text_input(label, key=f"gen_{col}_input_{idx}")
-            mask = pd.Series([True] * len(df))
-            for col, selected in filters.items():
-                if col in df.columns and selected:
-                    if isinstance(selected, list):
-                        mask &= df[col].astype(str).isin(selected)
-                    else:
-                        mask &= df[col].astype(str).str.contains(selected, case=False, na=False)
-            filtered_df = df[mask]
-            card_func = lambda row, as_lines=False: generic_card(row, df.columns[:8], as_lines=as_lines)
-
-        pdf_bytes = download_pdf_reportlab(filtered_df, card_func)
-        st.download_button("Download results as PDF", data=pdf_bytes, file_name="contacts.pdf", mime="application/pdf")
+        # Both exports are built only when their button is clicked, not on every filter change
+        st.download_button(
+            "Download results as PDF",
+            data=lambda: download_pdf_reportlab(*build_rows_lines(filtered_df, card_func)),
+            file_name="contacts.pdf",
+            mime="application/pdf"
+        )
 
         # Excel download button for the filtered data
-        excel_bytes = BytesIO()
-        filtered_df.to_excel(excel_bytes, index=False)
-        excel_bytes.seek(0)
         st.download_button(
             "Download results as Excel",
-            data=excel_bytes,
+            data=lambda: to_xlsx({"Sheet1": filtered_df}),
             file_name="contacts.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
 
+        # Parquet keeps dtypes and is far cheaper to write than xlsx, for reloading in pandas
+        st.download_button(
+            "Download results as Parquet",
+            data=lambda: to_parquet(filtered_df),
+            file_name="contacts.parquet",
+            mime="application/vnd.apache.parquet"
+        )
+
         st.subheader(f"Contacts ({len(filtered_df)})")
-        render_cards(filtered_df, card_func, columns_per_row=3)
+        render_cards(filtered_df, card_func, columns_per_row=3, key=f"cards_{selected_sheet}")
 else:
     st.info("Please upload an Excel file to get started.")